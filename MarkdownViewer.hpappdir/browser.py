@@ -14,8 +14,8 @@ from hpprime import fillrect
 from graphics import draw_text, draw_rectangle, text_width
 from keycodes import KEY_UP, KEY_DOWN, KEY_ENTER, KEY_ESC
 from file_ops import list_files, get_file_size
-from input_helpers import get_key, get_touch, get_menu_tap
-from ui import draw_menu
+from input_helpers import poll, get_menu_tap, get_ticks
+from ui import draw_menu, show_context_menu
 import file_prefs
 
 # Column layout (pixel positions)
@@ -34,6 +34,14 @@ _ITEM_Y0 = const(54)
 _ITEM_H = const(20)
 _MAX_VISIBLE = const(8)
 
+# Long press: max finger travel, squared (10 px radius)
+_PRESS_SLOP_SQ = const(100)
+
+
+# File sizes by name, kept across picker sessions so each file is only
+# opened and seeked once.
+_size_cache = {}
+
 
 def _get_colors(colors):
     if colors is not None:
@@ -42,30 +50,72 @@ def _get_colors(colors):
     return theme.colors
 
 
+def _resolve_palette(colors):
+    """Resolve the picker colors once, with defaults for missing keys.
+
+    Returns (c, bg, subtitle, hint, hdr_bg, tbl_bdr, br_bdr, sel_bg,
+    sel_text, normal_text, alt_bg, err, prog_fg, fav) where c is the
+    underlying color dict (passed on to draw_menu).
+    """
+    c = _get_colors(colors)
+    # .get() defaults guard against KeyError if the dict is incomplete.
+    bg = c.get('browser_bg', 0xF8F8F8)
+    subtitle_c = c.get('browser_subtitle', 0x000080)
+    return (c, bg, subtitle_c,
+            c.get('browser_hint', subtitle_c),
+            c.get('table_header_bg', 0xE8E8E8),
+            c.get('table_border', 0xAAAAAA),
+            c.get('browser_border', 0x000080),
+            c.get('browser_sel', 0x000080),
+            c.get('browser_sel_text', 0xF8F8F8),
+            c.get('browser_text', 0x000000),
+            c.get('table_alt_bg', bg),
+            c.get('browser_error', 0xF80000),
+            c.get('progress_bar', c.get('header', 0x000080)),
+            c.get('fav_star', 0xCCA000))
+
+
 def get_files(ext=None):
     """List files from storage, optionally filtered by extension.
 
     Args:
         ext: file extension including dot (e.g. '.md'). None = all files.
     """
+    # AFiles() already returns a list of strings (or nothing at all).
     all_files = list_files()
-    result = []
-    if all_files:
-        for f in all_files:
-            s = str(f)
-            if ext is None or s.endswith(ext):
-                result.append(s)
-    return result
+    if not all_files:
+        return []
+    if ext is None:
+        return list(all_files)
+    return [f for f in all_files if f.endswith(ext)]
 
 
 def _format_size(size):
     """Format file size for display (always in KB, 2 decimals)."""
-    kb100 = (size * 100 + 512) // 1024
-    whole = kb100 // 100
-    frac = kb100 % 100
-    if frac < 10:
-        return str(whole) + '.0' + str(frac) + ' KB'
-    return str(whole) + '.' + str(frac) + ' KB'
+    return '%d.%02d KB' % divmod((size * 100 + 512) // 1024, 100)
+
+
+def _first_visible(selected):
+    """Index of the top visible row when ``selected`` is in view."""
+    if selected >= _MAX_VISIBLE:
+        return selected - _MAX_VISIBLE + 1
+    return 0
+
+
+def _cached_size(fname):
+    """Return the size of fname in bytes, querying storage only once."""
+    sz = _size_cache.get(fname)
+    if sz is None:
+        sz = get_file_size(fname)
+        _size_cache[fname] = sz
+    return sz
+
+
+def _forget_missing(present):
+    """Drop cached sizes of files that are no longer in ``present``."""
+    present = set(present)
+    for f in [f for f in _size_cache if f not in present]:
+        del _size_cache[f]
 
 
 def _draw_progress_bar(x, y, w, h, pct, fg_color, bg_color, border_color):
@@ -94,36 +144,106 @@ def _file_label(fname):
     return fname
 
 
-def _build_file_list(ext, sizes):
-    """Build sorted file list based on current sort settings.
+def _header_labels():
+    """Build the (fav, name, size) column header labels.
 
-    Args:
-        ext: file extension filter.
-        sizes: dict {filename: size_in_bytes}.
-
-    Returns list of (filename, size, is_fav) tuples.
+    The active sort column gets an up/down arrow.
     """
-    raw_files = get_files(ext)
-    favs = file_prefs.get_favorites()
     col, asc = file_prefs.get_sort()
+    arrow = ' \u25B2' if asc else ' \u25BC'
+    return ('\u2605' + arrow if col == 'fav' else '\u2605',
+            'Name' + arrow if col == 'name' else 'Name',
+            'Size' + arrow if col == 'size' else 'Size')
+
+
+def _tag_of(fname):
+    """Tag ID for fname, with unknown IDs mapped to 0 (no tag)."""
+    tag_id = file_prefs.get_tag(fname)
+    if tag_id < 0 or tag_id >= len(file_prefs.TAG_COLORS):
+        return 0
+    return tag_id
+
+
+def _permute(column, order):
+    """Return column reordered by the row permutation ``order``."""
+    return [column[i] for i in order]
 
-    items = []
-    for f in raw_files:
-        sz = sizes.get(f, 0)
-        is_fav = f in favs
-        items.append((f, sz, is_fav))
 
-    if col == 'fav':
-        if asc:
-            items.sort(key=lambda x: (not x[2], x[0].lower()))
+class _FileTable:
+    """File list stored column-wise: one list per field, aligned by row.
+
+    Columns: names, sizes, favs, tags, pcts, labels, size_strs.
+    Tags, reading progress and the display strings are computed once
+    here so that redraws never call into file_prefs or allocate
+    strings.
+    """
+
+    def __init__(self, fnames):
+        favs = file_prefs.get_favorites_set()
+        self.names = fnames
+        self.sizes = [_cached_size(f) for f in fnames]
+        self.favs = [f in favs for f in fnames]
+        self.tags = [_tag_of(f) for f in fnames]
+        self.pcts = [file_prefs.get_progress(f) for f in fnames]
+        self.labels = [_file_label(f) for f in fnames]
+        self.size_strs = [_format_size(sz) for sz in self.sizes]
+
+    def sort(self):
+        """Reorder all columns by the current sort settings."""
+        col, asc = file_prefs.get_sort()
+        names = self.names
+
+        # Argsort by decorate-sort-undecorate: each key is computed
+        # exactly once and the list is sorted without a key function
+        # (MicroPython's sort calls it on every comparison).  The row
+        # index gives the permutation and breaks ties, so, as with a
+        # stable sort, tied rows keep the order the table is in now.
+        if col == 'fav':
+            # Favorites first when ascending, last when descending
+            favs = self.favs
+            dec = [(favs[i] != asc, names[i].lower(), i)
+                   for i in range(len(names))]
+            dec.sort()
+            order = [d[-1] for d in dec]
         else:
-            items.sort(key=lambda x: (x[2], x[0].lower()))
-    elif col == 'size':
-        items.sort(key=lambda x: x[1], reverse=not asc)
-    else:
-        items.sort(key=lambda x: x[0].lower(), reverse=not asc)
+            # reverse=True flips the tie-breaker too, so descending
+            # sorts store the index negated to keep ties in row order
+            tie = 1 if asc else -1
+            if col == 'size':
+                dec = [(sz, tie * i) for i, sz in enumerate(self.sizes)]
+            else:
+                dec = [(f.lower(), tie * i) for i, f in enumerate(names)]
+            dec.sort(reverse=not asc)
+            order = [tie * d[-1] for d in dec]
+
+        self.names = _permute(names, order)
+        self.sizes = _permute(self.sizes, order)
+        self.favs = _permute(self.favs, order)
+        self.tags = _permute(self.tags, order)
+        self.pcts = _permute(self.pcts, order)
+        self.labels = _permute(self.labels, order)
+        self.size_strs = _permute(self.size_strs, order)
+
+
+def _index_names(names):
+    """Map each filename to its row index."""
+    return {f: i for i, f in enumerate(names)}
+
+
+def _build_file_list(ext, raw_files=None):
+    """Build sorted file list based on current sort settings.
 
-    return items
+    Args:
+        ext: file extension filter.
+        raw_files: already-listed filenames, or None to query storage.
+
+    Returns a _FileTable.
+    """
+    if raw_files is None:
+        raw_files = get_files(ext)
+    table = _FileTable(raw_files)
+    table.sort()
+    return table
 
 
 def file_picker(title="Files", subtitle="Select a file", ext=None,
@@ -144,52 +264,116 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
     Returns:
         Selected filename (str), or None if cancelled (ESC / ON).
     """
-    # Compute file sizes once
-    raw = get_files(ext)
-    sizes = {}
-    for f in raw:
-        sizes[f] = get_file_size(f)
-
-    items = _build_file_list(ext, sizes)
-    selected = 0
-
-    if highlight:
-        for i in range(len(items)):
-            if items[i][0] == highlight:
-                selected = i
-                break
+    table = _build_file_list(ext)
+    # Filename -> row index, rebuilt whenever the row order changes
+    index_by_name = _index_names(table.names)
+    selected = index_by_name.get(highlight, 0) if highlight else 0
 
     if menu_labels is None:
         menu_labels = ["", "", "", "", "", ""]
 
+    # Resolved once per session; refreshed after menu actions, which
+    # may switch the theme.
+    palette = _resolve_palette(colors)
+    # Column header labels; rebuilt only when the sort changes.
+    hdr_labels = _header_labels()
+
     touch_down = False
     tap_x = -1
     tap_y = -1
     touch_start_time = 0
     long_press_fired = False
 
-    from input_helpers import get_ticks
+    def _draw_rows(rows, start, repaint):
+        """Draw the given file rows, with ``start`` as the top row.
+
+        With ``repaint`` set, every row paints its own background and
+        column dividers, so rows can be redrawn without clearing the
+        whole screen first.  Otherwise the caller draws the dividers
+        as full-height strips.
+        """
+        (c, bg, subtitle_c, hint_c, hdr_bg, tbl_bdr, br_bdr, sel_bg,
+         sel_text, normal_text, alt_bg, err_c, prog_fg, fav_c) = palette
+
+        # Globals used per row are bound to locals first:
+        # imported names (and the module-level functions) otherwise cost
+        # a dict lookup on every use.  The underscore const()s need no
+        # binding as the compiler already inlines them.
+        _rect = draw_rectangle
+        _text = draw_text
+        _fill = fillrect
+        _bar = _draw_progress_bar
+        gr = GR_AFF
+        f10 = FONT_10
+        tag_colors = file_prefs.TAG_COLORS
+        names = table.names
+        favs = table.favs
+        tags = table.tags
+        pcts = table.pcts
+        labels = table.labels
+        size_strs = table.size_strs
+
+        for i in rows:
+            y = _ITEM_Y0 + (i - start) * _ITEM_H
+            fname = names[i]
 
-    def _fav_color():
-        c = _get_colors(colors)
-        return c.get('fav_star', 0xCCA000)
+            if i == selected:
+                _rect(gr, 6, y, 314, y + _ITEM_H - 2,
+                      sel_bg, 255, sel_bg, 255)
+                text_c = sel_text
+            else:
+                text_c = normal_text
+                if (i - start) % 2 == 1:
+                    _rect(gr, 6, y, 314, y + _ITEM_H - 2,
+                          alt_bg, 255, alt_bg, 255)
+                elif repaint:
+                    _rect(gr, 6, y, 314, y + _ITEM_H - 2,
+                          bg, 255, bg, 255)
 
-    def draw_screen():
-        c = _get_colors(colors)
-        # Cache color lookups to avoid repeated dict access and
-        # guard against KeyError if theme dict is incomplete.
-        bg = c.get('browser_bg', 0xF8F8F8)
-        subtitle_c = c.get('browser_subtitle', 0x000080)
-        hint_c = c.get('browser_hint', subtitle_c)
-        hdr_bg = c.get('table_header_bg', 0xE8E8E8)
-        tbl_bdr = c.get('table_border', 0xAAAAAA)
-        br_bdr = c.get('browser_border', 0x000080)
-        sel_bg = c.get('browser_sel', 0x000080)
-        sel_text = c.get('browser_sel_text', 0xF8F8F8)
-        normal_text = c.get('browser_text', 0x000000)
-        alt_bg = c.get('table_alt_bg', bg)
-        err_c = c.get('browser_error', 0xF80000)
-        prog_fg = c.get('progress_bar', c.get('header', 0x000080))
+            # Favorite star
+            if favs[i]:
+                _text(gr, _COL_FAV_X + 4, y + 3, '\u2605', f10, fav_c)
+            elif highlight and fname == highlight and i != selected:
+                _text(gr, _COL_FAV_X + 4, y + 3, '\u25B6', f10, hint_c)
+
+            # File name + tag dot
+            name_x = _COL_NAME_X + 2
+            tag_id = tags[i]
+            if tag_id > 0:
+                tc = tag_colors[tag_id]
+                _fill(gr, name_x, y + 6, 6, 6, tc, tc)
+                name_x += 9
+            max_name_w = _COL_DIV2 - name_x - 2
+            _text(gr, name_x, y + 3, labels[i], f10, text_c, max_name_w)
+
+            # Size
+            _text(gr, _COL_SIZE_X + 2, y + 3, size_strs[i], f10, text_c)
+
+            # Reading progress bar
+            pct = pcts[i]
+            if pct > 0:
+                bar_x = _COL_RIGHT - 16
+                bar_y = y + _ITEM_H // 2 - 2
+                bar_bg = sel_bg if i == selected else (
+                    alt_bg if (i - start) % 2 == 1 else bg)
+                _bar(bar_x, bar_y, 14, 4, pct, prog_fg, bar_bg, hint_c)
+
+            # Column dividers for this row
+            if repaint:
+                div_c = sel_bg if i == selected else tbl_bdr
+                _rect(gr, _COL_DIV1, y, _COL_DIV1 + 1, y + _ITEM_H - 2,
+                      div_c, 255, div_c, 255)
+                _rect(gr, _COL_DIV2, y, _COL_DIV2 + 1, y + _ITEM_H - 2,
+                      div_c, 255, div_c, 255)
+
+    def _draw_chrome():
+        """Draw everything except the file rows.
+
+        Title, column headers, borders and menu bar.  These only change
+        with the sort, the theme, or when a popup has overdrawn them.
+        """
+        (c, bg, subtitle_c, hint_c, hdr_bg, tbl_bdr, br_bdr, sel_bg,
+         sel_text, normal_text, alt_bg, err_c, prog_fg, fav_c) = palette
 
         fillrect(0, 0, 0, 320, menu_y, bg, bg)
 
@@ -204,37 +388,25 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
         draw_rectangle(GR_AFF, 5, _HDR_Y, 315, _HDR_Y + _HDR_H,
                        hdr_bg, 255, hdr_bg, 255)
 
-        col, asc = file_prefs.get_sort()
-        arrow = ' \u25B2' if asc else ' \u25BC'
+        fav_hdr, name_hdr, size_hdr = hdr_labels
 
         # Fav column header
-        fav_hdr = '\u2605'
-        if col == 'fav':
-            fav_hdr += arrow
         draw_text(GR_AFF, _COL_FAV_X + 2, _HDR_Y + 2, fav_hdr, FONT_10,
-                  _fav_color())
+                  fav_c)
 
         # Name column header
-        name_hdr = 'Name'
-        if col == 'name':
-            name_hdr += arrow
         draw_text(GR_AFF, _COL_NAME_X + 2, _HDR_Y + 2, name_hdr, FONT_10,
                   subtitle_c)
 
         # Size column header
-        size_hdr = 'Size'
-        if col == 'size':
-            size_hdr += arrow
         draw_text(GR_AFF, _COL_SIZE_X + 2, _HDR_Y + 2, size_hdr, FONT_10,
                   subtitle_c)
 
-        # Column dividers in header
-        draw_rectangle(GR_AFF, _COL_DIV1, _HDR_Y,
-                       _COL_DIV1 + 1, _HDR_Y + _HDR_H,
-                       tbl_bdr, 255, tbl_bdr, 255)
-        draw_rectangle(GR_AFF, _COL_DIV2, _HDR_Y,
-                       _COL_DIV2 + 1, _HDR_Y + _HDR_H,
-                       tbl_bdr, 255, tbl_bdr, 255)
+        # Column dividers through the header and separator
+        fillrect(GR_AFF, _COL_DIV1, _HDR_Y, 1, _ITEM_Y0 - _HDR_Y,
+                 tbl_bdr, tbl_bdr)
+        fillrect(GR_AFF, _COL_DIV2, _HDR_Y, 1, _ITEM_Y0 - _HDR_Y,
+                 tbl_bdr, tbl_bdr)
 
         # Separator below header
         draw_rectangle(GR_AFF, 5, _SEP_Y, 315, _SEP_Y + 1,
@@ -247,130 +419,102 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
         draw_rectangle(GR_AFF, 314, _HDR_Y, 315, bdr_bottom,
                        br_bdr, 255, br_bdr, 255)
 
-        # File rows
-        start = 0
-        if selected >= _MAX_VISIBLE:
-            start = selected - _MAX_VISIBLE + 1
-
-        for i in range(start, min(start + _MAX_VISIBLE, len(items))):
-            y = _ITEM_Y0 + (i - start) * _ITEM_H
-            fname, sz, is_fav = items[i]
-            label = _file_label(fname)
-            size_str = _format_size(sz)
-
-            if i == selected:
-                draw_rectangle(GR_AFF, 6, y, 314, y + _ITEM_H - 2,
-                               sel_bg, 255, sel_bg, 255)
-                text_c = sel_text
-            else:
-                text_c = normal_text
-                if (i - start) % 2 == 1:
-                    draw_rectangle(GR_AFF, 6, y, 314, y + _ITEM_H - 2,
-                                   alt_bg, 255, alt_bg, 255)
-
-            # Favorite star
-            if is_fav:
-                draw_text(GR_AFF, _COL_FAV_X + 4, y + 3, '\u2605',
-                          FONT_10, _fav_color())
-            elif highlight and fname == highlight and i != selected:
-                draw_text(GR_AFF, _COL_FAV_X + 4, y + 3, '\u25B6',
-                          FONT_10, hint_c)
-
-            # File name + tag dot
-            tag_id = file_prefs.get_tag(fname)
-            name_x = _COL_NAME_X + 2
-            if tag_id > 0 and tag_id < len(file_prefs.TAG_COLORS):
-                tc = file_prefs.TAG_COLORS[tag_id]
-                fillrect(GR_AFF, name_x, y + 6, 6, 6, tc, tc)
-                name_x += 9
-            max_name_w = _COL_DIV2 - name_x - 2
-            draw_text(GR_AFF, name_x, y + 3, label,
-                      FONT_10, text_c, max_name_w)
+        # Bottom border
+        draw_rectangle(GR_AFF, 5, bdr_bottom, 315, bdr_bottom + 1,
+                       br_bdr, 255, br_bdr, 255)
+        draw_menu(menu_labels, menu_y=menu_y, colors=c)
 
-            # Size
-            draw_text(GR_AFF, _COL_SIZE_X + 2, y + 3, size_str,
-                      FONT_10, text_c)
+    def _draw_list():
+        """Clear the row area between the borders and draw the rows."""
+        (c, bg, subtitle_c, hint_c, hdr_bg, tbl_bdr, br_bdr, sel_bg,
+         sel_text, normal_text, alt_bg, err_c, prog_fg, fav_c) = palette
 
-            # Reading progress bar
-            pct = file_prefs.get_progress(fname)
-            if pct > 0:
-                bar_x = _COL_RIGHT - 16
-                bar_y = y + _ITEM_H // 2 - 2
-                bar_bg = sel_bg if i == selected else (
-                    alt_bg if (i - start) % 2 == 1 else bg)
-                _draw_progress_bar(bar_x, bar_y, 14, 4, pct,
-                                   prog_fg, bar_bg, hint_c)
+        fillrect(GR_AFF, 6, _ITEM_Y0, 308, menu_y - 3 - _ITEM_Y0, bg, bg)
 
-            # Column dividers for this row
-            div_c = sel_bg if i == selected else tbl_bdr
-            draw_rectangle(GR_AFF, _COL_DIV1, y,
-                           _COL_DIV1 + 1, y + _ITEM_H - 2,
-                           div_c, 255, div_c, 255)
-            draw_rectangle(GR_AFF, _COL_DIV2, y,
-                           _COL_DIV2 + 1, y + _ITEM_H - 2,
-                           div_c, 255, div_c, 255)
-
-        if len(items) == 0:
+        start = _first_visible(selected)
+        end = min(start + _MAX_VISIBLE, len(table.names))
+        if end <= start:
             draw_text(GR_AFF, 15, _ITEM_Y0 + 6, "No files found", FONT_10,
                       err_c)
+            return
+        _draw_rows(range(start, end), start, False)
+
+        # Column dividers: one strip each down to the last visible row,
+        # instead of a short rectangle per row.  The selected row hides
+        # its dividers.
+        div_h = (end - start) * _ITEM_H - 2
+        fillrect(GR_AFF, _COL_DIV1, _ITEM_Y0, 1, div_h, tbl_bdr, tbl_bdr)
+        fillrect(GR_AFF, _COL_DIV2, _ITEM_Y0, 1, div_h, tbl_bdr, tbl_bdr)
+        if start <= selected < end:
+            y = _ITEM_Y0 + (selected - start) * _ITEM_H
+            fillrect(GR_AFF, _COL_DIV1, y, 1, _ITEM_H - 2, sel_bg, sel_bg)
+            fillrect(GR_AFF, _COL_DIV2, y, 1, _ITEM_H - 2, sel_bg, sel_bg)
 
-        # Bottom border
-        draw_rectangle(GR_AFF, 5, bdr_bottom, 315, bdr_bottom + 1,
-                       br_bdr, 255, br_bdr, 255)
-        draw_menu(menu_labels, menu_y=menu_y, colors=c)
+    def draw_screen():
+        _draw_chrome()
+        _draw_list()
+
+    def _move_selection(new_sel):
+        """Select row new_sel, repainting only what changed."""
+        nonlocal selected
+        old = selected
+        selected = new_sel
+        start = _first_visible(old)
+        if _first_visible(new_sel) == start:
+            _draw_rows((old, new_sel), start, True)
+        else:
+            _draw_list()
 
     def _header_tap(tx):
         """Handle a tap on a column header."""
-        nonlocal items, selected
-        sel_fname = items[selected][0] if items else None
+        nonlocal selected, index_by_name, hdr_labels
+        sel_fname = table.names[selected] if table.names else None
         if tx < _COL_DIV1:
             file_prefs.cycle_sort('fav')
         elif tx < _COL_DIV2:
             file_prefs.cycle_sort('name')
         else:
             file_prefs.cycle_sort('size')
-        items = _build_file_list(ext, sizes)
-        selected = 0
-        if sel_fname:
-            for i in range(len(items)):
-                if items[i][0] == sel_fname:
-                    selected = i
-                    break
+        hdr_labels = _header_labels()
+        # Only the order changed — re-sort the rows we already have.
+        table.sort()
+        index_by_name = _index_names(table.names)
+        selected = index_by_name.get(sel_fname, 0)
         return True
 
     def _star_tap(row_idx):
         """Toggle favorite for the tapped row."""
-        nonlocal items, selected
-        if row_idx < 0 or row_idx >= len(items):
+        nonlocal selected, index_by_name
+        if row_idx < 0 or row_idx >= len(table.names):
             return False
-        fname = items[row_idx][0]
-        file_prefs.toggle_favorite(fname)
-        sel_fname = items[selected][0] if items else None
-        items = _build_file_list(ext, sizes)
-        selected = 0
-        if sel_fname:
-            for i in range(len(items)):
-                if items[i][0] == sel_fname:
-                    selected = i
-                    break
+        _, is_fav = file_prefs.toggle_favorite(table.names[row_idx])
+        # Only this row's star changed: patch it in place, and re-sort
+        # only when the order depends on favorites.
+        table.favs[row_idx] = is_fav
+        if file_prefs.get_sort()[0] != 'fav':
+            return True
+        sel_fname = table.names[selected]
+        table.sort()
+        index_by_name = _index_names(table.names)
+        selected = index_by_name.get(sel_fname, 0)
         return True
 
     def _do_menu(slot):
         """Process a menu action. Returns a filename or None."""
-        nonlocal items, selected
+        nonlocal table, selected, palette, index_by_name
         if not on_menu_tap:
             return None
-        sel_file = items[selected][0] if items else None
+        sel_file = table.names[selected] if table.names else None
         result = on_menu_tap(slot, sel_file)
+        palette = _resolve_palette(colors)
         if result == 'reload':
-            items = _build_file_list(ext, sizes)
-            if selected >= len(items):
-                selected = max(0, len(items) - 1)
-            if sel_file:
-                for i in range(len(items)):
-                    if items[i][0] == sel_file:
-                        selected = i
-                        break
+            raw = get_files(ext)
+            _forget_missing(raw)
+            table = _build_file_list(ext, raw)
+            index_by_name = _index_names(table.names)
+            if selected >= len(table.names):
+                selected = max(0, len(table.names) - 1)
+            selected = index_by_name.get(sel_file, selected)
             draw_screen()
         elif isinstance(result, str) and result.startswith('open:'):
             return result[5:]
@@ -382,23 +526,20 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
 
     try:
         while True:
-            key = get_key()
+            key, tx, ty = poll()
             if key > 0:
                 if key == KEY_UP:
                     if selected > 0:
-                        selected -= 1
-                        draw_screen()
+                        _move_selection(selected - 1)
                 elif key == KEY_DOWN:
-                    if items and selected < len(items) - 1:
-                        selected += 1
-                        draw_screen()
+                    if table.names and selected < len(table.names) - 1:
+                        _move_selection(selected + 1)
                 elif key == KEY_ENTER:
-                    if items:
-                        return items[selected][0]
+                    if table.names:
+                        return table.names[selected]
                 elif key == KEY_ESC:
                     return None
 
-            tx, ty = get_touch()
             if tx >= 0 and ty >= 0:
                 if not touch_down:
                     touch_down = True
@@ -408,20 +549,19 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
                     long_press_fired = False
                 else:
                     # Long press detection for tag assignment
-                    if (not long_press_fired and items
+                    dx = tx - tap_x
+                    dy = ty - tap_y
+                    if (not long_press_fired and table.names
                             and tap_y >= _ITEM_Y0 and tap_y < menu_y
-                            and abs(tx - tap_x) + abs(ty - tap_y) < 10):
+                            and dx * dx + dy * dy < _PRESS_SLOP_SQ):
                         elapsed = get_ticks() - touch_start_time
                         if elapsed >= 600:  # LONG_PRESS_MS
                             long_press_fired = True
-                            start_row = 0
-                            if selected >= _MAX_VISIBLE:
-                                start_row = selected - _MAX_VISIBLE + 1
+                            start_row = _first_visible(selected)
                             row = (tap_y - _ITEM_Y0) // _ITEM_H
                             tapped = start_row + row
-                            if tapped < len(items):
-                                fname = items[tapped][0]
-                                from ui import show_context_menu
+                            if tapped < len(table.names):
+                                fname = table.names[tapped]
                                 cur_tag = file_prefs.get_tag(fname)
                                 tag_labels = []
                                 for ti in range(len(file_prefs.TAG_NAMES)):
@@ -434,6 +574,7 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
                                     content_bottom=menu_y)
                                 if choice >= 0:
                                     file_prefs.set_tag(fname, choice)
+                                    table.tags[tapped] = _tag_of(fname)
                                 draw_screen()
             elif touch_down:
                 touch_down = False
@@ -451,21 +592,18 @@ def file_picker(title="Files", subtitle="Select a file", ext=None,
                         if result is not None:
                             return result
                 # File row tap
-                elif items and tap_y >= _ITEM_Y0 and tap_y < menu_y:
-                    start = 0
-                    if selected >= _MAX_VISIBLE:
-                        start = selected - _MAX_VISIBLE + 1
+                elif table.names and tap_y >= _ITEM_Y0 and tap_y < menu_y:
+                    start = _first_visible(selected)
                     row = (tap_y - _ITEM_Y0) // _ITEM_H
                     tapped = start + row
-                    if tapped < len(items):
+                    if tapped < len(table.names):
                         if tap_x < _COL_DIV1:
                             if _star_tap(tapped):
-                                draw_screen()
+                                _draw_list()
                         elif tapped == selected:
-                            return items[selected][0]
+                            return table.names[selected]
                         else:
-                            selected = tapped
-                            draw_screen()
+                            _move_selection(tapped)
 
     except KeyboardInterrupt:
         return None
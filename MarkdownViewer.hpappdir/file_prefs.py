@@ -14,6 +14,7 @@ from micropython import const
 MAX_RECENT = const(10)
 
 _favorites = None
+_favorites_set = None
 _sort_col = 'fav'
 _sort_asc = True
 _recent = None
@@ -47,9 +48,20 @@ def get_favorites():
     return _favorites
 
 
+def get_favorites_set():
+    """Get the favorite filenames as a set, for fast membership tests.
+
+    The set is cached and rebuilt only after toggle_favorite().
+    """
+    global _favorites_set
+    if _favorites_set is None:
+        _favorites_set = set(get_favorites())
+    return _favorites_set
+
+
 def toggle_favorite(filename):
     """Toggle pin status. Returns (updated_list, is_now_pinned)."""
-    global _favorites
+    global _favorites, _favorites_set
     favs = list(get_favorites())
     if filename in favs:
         favs.remove(filename)
@@ -58,6 +70,7 @@ def toggle_favorite(filename):
         favs.append(filename)
         is_pinned = True
     _favorites = favs
+    _favorites_set = None
     _save_favorites_file(favs)
     return favs, is_pinned
 
@@ -235,6 +248,27 @@ def set_scroll_pos(filename, pos):
     _save_positions(_positions)
 
 
+def persist(filename, scroll_pos, percent):
+    """Record a file's scroll position and reading progress together.
+
+    Each store is rewritten only if its value changed, so closing a
+    document that was not scrolled writes nothing to flash.
+    """
+    global _positions, _progress
+    if _positions is None:
+        _positions = _load_positions()
+    pos = int(scroll_pos)
+    if _positions.get(filename) != pos:
+        _positions[filename] = pos
+        _save_positions(_positions)
+    if _progress is None:
+        _progress = _load_progress_file()
+    pct = max(0, min(100, int(percent)))
+    if _progress.get(filename) != pct:
+        _progress[filename] = pct
+        _save_progress_file(_progress)
+
+
 # --- File tags / categories ---
 
 TAG_COLORS = [0x000000, 0x0000CC, 0x008800, 0xCC6600, 0xCC0000, 0x8800AA]
@@ -33,9 +33,8 @@ def get_touch_y():
     return -1
 
 
-def get_touch():
-    """Get (x, y) of the current touch, or (-1, -1) if not touching."""
-    m = heval("mouse")
+def _touch_xy(m):
+    """Extract (x, y) from a mouse() result, or (-1, -1) if not touching."""
     if m:
         f = m[0]
         if type(f) is list:
@@ -46,6 +45,23 @@ def get_touch():
     return (-1, -1)
 
 
+def get_touch():
+    """Get (x, y) of the current touch, or (-1, -1) if not touching."""
+    return _touch_xy(heval("mouse"))
+
+
+def poll():
+    """Read key and touch together, for event loops that need both.
+
+    Returns (key, x, y): key is 0 if none pressed, x and y are -1 if
+    the screen is not being touched.  Waits 1/20 s like get_key().
+    """
+    heval('wait(1/20)')
+    k = heval('GETKEY()')
+    x, y = _touch_xy(heval("mouse"))
+    return (k if k > 0 else 0, x, y)
+
+
 def mouse_clear():
     """Drain all pending touch events to prevent ghost taps / bounce."""
     while heval('mouse(1)') >= 0:
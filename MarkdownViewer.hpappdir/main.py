@@ -9,11 +9,11 @@ from keycodes import (KEY_UP, KEY_DOWN, KEY_ESC, KEY_PLUS,
     KEY_MINUS, KEY_BACKSPACE, KEY_LOG, KEY_F1, KEY_F2,
     KEY_F3, KEY_F4, KEY_F5, KEY_F6, KEY_LEFT, KEY_RIGHT)
 from markdown_viewer import MarkdownViewer
-from input_helpers import get_key, get_key_fast, get_touch, get_ticks, get_menu_tap, mouse_clear
+from input_helpers import poll, get_ticks, get_menu_tap, mouse_clear
+# Dialogs are imported where they are opened; only the paint-path
+# helpers are bound at load time.
 from ui import (draw_menu, draw_notch, is_notch_tap,
-    save_menu_area, restore_menu_area,
-    show_search_input, show_context_menu, show_list_manager,
-    show_stats_dialog, show_goto_dialog, show_shortcuts_overlay)
+    save_menu_area, restore_menu_area)
 from graphics import draw_text, text_width
 from browser import file_picker
 import theme
@@ -23,12 +23,22 @@ import file_prefs
 VIEWER_MENU = ["Find", "Next", "Marks", "TOC", "More", "Theme"]
 BROWSER_MENU = ["Recent", "", "", "", "Help", "Theme"]
 
+# Chrome colors from theme.snapshot(); refreshed on every theme change
+_C = theme.snapshot()
+
+
+def _refresh_palette():
+    global _C
+    _C = theme.snapshot()
+
 
 def save_last_file(filename, scroll_pos):
     """Save last opened file and scroll position."""
     try:
         with open('.bookmark', 'w') as f:
-            f.write(filename + '\n' + str(scroll_pos))
+            f.write(filename)
+            f.write('\n')
+            f.write(str(scroll_pos))
     except:
         pass
 
@@ -37,20 +47,33 @@ def load_last_file():
     """Load last opened file and scroll position."""
     try:
         with open('.bookmark', 'r') as f:
-            lines = f.read().strip().split('\n')
-            if len(lines) >= 2:
-                return lines[0], int(lines[1])
-            elif len(lines) == 1:
-                return lines[0], 0
+            name = f.readline().strip()
+            scroll = f.readline().strip()
+        return name, int(scroll) if scroll else 0
     except:
         pass
     return None, 0
 
 
 def clear_screen():
+    _invalidate_progress()
     fillrect(0, 0, 0, 320, 240, 0, 0)
 
 
+def _clear_margins(bg):
+    """Clear the screen around the document viewport.
+
+    viewer.render() repaints the viewport (5, 5, 310, VIEWER_HEIGHT_FULL)
+    from its own cleared back buffer, so a full redraw only needs the
+    margins cleared rather than the whole screen.
+    """
+    vb = 5 + VIEWER_HEIGHT_FULL
+    fillrect(0, 0, 0, 320, 5, bg, bg)
+    fillrect(0, 0, vb, 320, 240 - vb, bg, bg)
+    fillrect(0, 0, 5, 5, VIEWER_HEIGHT_FULL, bg, bg)
+    fillrect(0, 315, 5, 5, VIEWER_HEIGHT_FULL, bg, bg)
+
+
 def _browser_menu_tap(slot, selected_file):
     """Handle menu taps in the file browser.
 
@@ -64,6 +87,7 @@ def _browser_menu_tap(slot, selected_file):
         recent = file_prefs.get_recent()
         if not recent:
             return True
+        from ui import show_list_manager
         result = show_list_manager(
             title="Recent Files",
             subtitle="Last opened",
@@ -82,86 +106,143 @@ def _browser_menu_tap(slot, selected_file):
         return 'open:' + _find_help_file()
     elif slot == 5:  # Theme
         theme.toggle()
+        _refresh_palette()
         return True
     return False
 
 
+_help_file_cache = None  # resolved by the first _find_help_file() call
+
+
 def _find_help_file():
-    """Find the best help file based on system language."""
+    """Find the best help file based on system language (cached)."""
+    global _help_file_cache
+    if _help_file_cache is None:
+        _help_file_cache = _probe_help_file()
+    return _help_file_cache
+
+
+# Help translations: PPL Language number, and name prefix for
+# firmwares that report the language as a string
+_LANG_INT = {2: 'es', 3: 'fr', 4: 'de', 5: 'it', 6: 'pt'}
+_LANG_STR = (('espa', 'es'), ('fran', 'fr'), ('deut', 'de'), ('ital', 'it'))
+
+
+def _probe_help_file():
+    """Return the localized help file if present, else 'help.md'."""
     try:
         from hpprime import eval as heval
         lang = heval('Language')
-        codes = []
+        code = None
         if type(lang) is int:
-            m = {2: 'es', 3: 'fr', 4: 'de', 5: 'it', 6: 'pt'}
-            if lang in m:
-                codes.append(m[lang])
+            code = _LANG_INT.get(lang)
         elif type(lang) is str:
             lang_l = lang[:4].lower()
-            for prefix, code in [('espa', 'es'), ('fran', 'fr'),
-                                  ('deut', 'de'), ('ital', 'it')]:
+            for prefix, c in _LANG_STR:
                 if prefix in lang_l:
-                    codes.append(code)
+                    code = c
                     break
-        for code in codes:
-            name = 'help_' + code + '.md'
-            try:
-                with open(name, 'r') as f:
-                    f.read(1)
-                return name
-            except:
-                pass
+        if code is None:
+            return 'help.md'
+        name = 'help_' + code + '.md'
+        open(name, 'r').close()
+        return name
     except:
         pass
     return 'help.md'
 
 
 _search_pill_x = 320  # left edge of the search status pill
+_bar_w = -1  # width of the top progress bar on screen, -1 = unknown
+
+# Split-TOC row under each y of the pane (rows are 15 px from y=4, five
+# shown); 255 marks the gaps above and below the drawn rows.
+_TOC_ROWS = bytes((y - 4) // 15 if 4 <= y < 79 else 255 for y in range(82))
+
+# Label width memo for the status pills.  graphics.text_width has its own
+# cache, but document rendering churns it; these few labels stay warm here.
+_tw_cache = {}
+_TW_CACHE_MAX = 64
+
+
+def _cached_tw(label):
+    """Width of a FONT_10 status label (cached)."""
+    w = _tw_cache.get(label)
+    if w is None:
+        if len(_tw_cache) >= _TW_CACHE_MAX:
+            _tw_cache.clear()
+        w = text_width(label, FONT_10)
+        _tw_cache[label] = w
+    return w
 
 
 def _draw_search_status(viewer):
     """Draw 'X of Y' search match counter at bottom-right."""
     global _search_pill_x
     info = viewer.get_search_info()
-    c = theme.colors
     _search_pill_x = 320
     sy = 227
     if info:
         cur, total = info
         label = str(cur) + ' of ' + str(total) + ' matches'
-        tw = text_width(label, FONT_10)
+        tw = _cached_tw(label)
         sw = tw + 8
         _search_pill_x = 320 - sw
-        fillrect(GR_AFF, _search_pill_x, sy, sw, 13, c['menu_bg'], c['menu_bg'])
-        draw_text(GR_AFF, _search_pill_x + 4, sy + 2, label, FONT_10, c['menu_text'])
+        menu_bg = _C[1]
+        fillrect(GR_AFF, _search_pill_x, sy, sw, 13, menu_bg, menu_bg)
+        draw_text(GR_AFF, _search_pill_x + 4, sy + 2, label, FONT_10, _C[2])
+
+
+def _invalidate_progress():
+    """Force the next _draw_top_bar to repaint the whole bar."""
+    global _bar_w
+    _bar_w = -1
+
+
+def _draw_top_bar(bar_w, bar_c, bg):
+    """Paint the 2-px reading bar at the top with the fewest fillrects.
+
+    The bar sits outside the viewport flip, so it keeps its pixels between
+    calls: nothing is drawn when the width is unchanged, and only the
+    strip between the old and new widths otherwise.
+    """
+    global _bar_w
+    old_w = _bar_w
+    if bar_w == old_w:
+        return
+    _bar_w = bar_w
+    if old_w < 0:
+        if bar_w > 0:
+            fillrect(GR_AFF, 0, 0, bar_w, 2, bar_c, bar_c)
+        if bar_w < 320:
+            fillrect(GR_AFF, bar_w, 0, 320 - bar_w, 2, bg, bg)
+    elif bar_w > old_w:
+        fillrect(GR_AFF, old_w, 0, bar_w - old_w, 2, bar_c, bar_c)
+    else:
+        fillrect(GR_AFF, bar_w, 0, old_w - bar_w, 2, bg, bg)
 
 
 def _draw_progress(viewer):
     """Draw a small progress pill at the bottom-left, styled like the notch."""
     pct = viewer.get_progress_percent()
     label = str(pct) + '%'
-    tw = text_width(label, FONT_10)
+    tw = _cached_tw(label)
     pw = tw + 8
     px = 0
     py = 227
-    c = theme.colors
-    fillrect(GR_AFF, px, py, pw, 13, c['menu_bg'], c['menu_bg'])
-    draw_text(GR_AFF, px + 4, py + 2, label, FONT_10, c['menu_text'])
+    menu_bg = _C[1]
+    fillrect(GR_AFF, px, py, pw, 13, menu_bg, menu_bg)
+    draw_text(GR_AFF, px + 4, py + 2, label, FONT_10, _C[2])
     _draw_search_status(viewer)
     # Thin reading progress bar at the very top of the screen
-    bar_w = int(320 * pct / 100) if pct < 100 else 320
-    bar_c = c.get('progress_bar', c['header'])
-    bg = c['bg']
-    if bar_w > 0:
-        fillrect(GR_AFF, 0, 0, bar_w, 2, bar_c, bar_c)
-    if bar_w < 320:
-        fillrect(GR_AFF, bar_w, 0, 320 - bar_w, 2, bg, bg)
+    _draw_top_bar(int(320 * pct / 100) if pct < 100 else 320, _C[4], _C[0])
 
 
 def main():
     """Main entry point — file browser then markdown viewer."""
     ppl_guard.init()
     theme.init()
+    _refresh_palette()
     last_file, last_scroll = load_last_file()
 
     while True:
@@ -203,33 +284,40 @@ def main():
         touch_down = False
         tap_x = -1
         tap_y = -1
-        touch_start_time = 0
+        long_press_at = 0  # ticks() value at which a held touch long-presses
         long_press_fired = False
+        lp_armed = False
         menu_visible = False
         action = 'back'
         scrollbar_dragging = False
 
         def _draw_overlay():
-            """Draw notch + progress bar (called after every scroll/render)."""
+            """Draw notch + progress bar (called after every scroll/render).
+
+            The notch overlaps the viewport that every render flips, so it
+            has to be repainted along with the pills after each scroll.
+            """
             draw_notch()
             _draw_progress(viewer)
 
         def redraw():
-            fillrect(0, 0, 0, 320, 240,
-                     theme.colors['bg'], theme.colors['bg'])
+            _invalidate_progress()
+            _clear_margins(_C[0])
             viewer.render()
             _draw_overlay()
 
-        fillrect(0, 0, 0, 320, 240,
-                 theme.colors['bg'], theme.colors['bg'])
+        _invalidate_progress()
+        _clear_margins(_C[0])
         viewer.render()
         _draw_overlay()
 
         def hide_menu():
             nonlocal menu_visible
             if menu_visible:
+                # The saved strip was taken with the notch on screen
+                # (show_menu only runs from a notch tap), so restoring
+                # it brings the notch back without a repaint.
                 restore_menu_area(MENU_Y)
-                draw_notch()
                 menu_visible = False
 
         def show_menu():
@@ -243,11 +331,13 @@ def main():
         def do_search():
             nonlocal menu_visible, search_case
             menu_visible = False
+            from ui import show_search_input
             term, search_case = show_search_input(
                 case_sensitive=search_case, menu_y=MENU_Y)
             mouse_clear()
-            fillrect(0, 0, 0, 320, 240,
-                     theme.colors['bg'], theme.colors['bg'])
+            _invalidate_progress()
+            bg = _C[0]
+            fillrect(0, 0, 0, 320, 240, bg, bg)
             if term:
                 viewer.search(term, case_sensitive=search_case)
             else:
@@ -257,6 +347,7 @@ def main():
         def open_bookmark_mgr():
             nonlocal marks, menu_visible
             menu_visible = False
+            from ui import show_list_manager
             labels = ["Position " + str(p) for p in marks]
             while True:
                 result = show_list_manager(
@@ -268,7 +359,7 @@ def main():
                                  "to add a bookmark."],
                     hint="Enter=Go  Del=Remove  ESC=Close",
                     allow_delete=True,
-                    item_icon_color=theme.colors['bookmark_mark'],
+                    item_icon_color=_C[10],
                     menu_y=MENU_Y,
                 )
                 if result is None:
@@ -283,10 +374,23 @@ def main():
                     if idx < len(marks):
                         marks = bookmarks.remove(filename, marks[idx])
                         viewer.set_bookmarks(marks)
-                        labels = ["Position " + str(p) for p in marks]
+                        # Both lists are sorted, so the label goes too
+                        del labels[idx]
             mouse_clear()
             redraw()
 
+        toc_headers = None
+        toc_labels = None
+
+        def get_toc_labels(headers):
+            """Indented TOC labels for headers, rebuilt only when they change."""
+            nonlocal toc_headers, toc_labels
+            if headers is not toc_headers:
+                toc_headers = headers
+                toc_labels = ['  ' * (level - 1) + title
+                              for level, title, _ in headers]
+            return toc_labels
+
         def open_toc():
             nonlocal menu_visible
             menu_visible = False
@@ -294,10 +398,8 @@ def main():
             if not headers:
                 redraw()
                 return
-            labels = []
-            for level, title, _ in headers:
-                prefix = '  ' * (level - 1)
-                labels.append(prefix + title)
+            labels = get_toc_labels(headers)
+            from ui import show_list_manager
             result = show_list_manager(
                 title="Table of Contents",
                 subtitle=filename,
@@ -312,6 +414,7 @@ def main():
                 if idx < len(headers):
                     _, _, line_idx = headers[idx]
                     viewer.scroll_to_line(line_idx)
+                    _invalidate_progress()
                     _draw_overlay()
                     return
             redraw()
@@ -320,19 +423,19 @@ def main():
             nonlocal menu_visible
             menu_visible = False
             lines, words, mins = viewer.get_document_stats()
+            from ui import show_stats_dialog
             show_stats_dialog(filename, lines, words, mins, MENU_Y)
             redraw()
 
         def navigate_link(url):
             """Open a .md link, pushing current file onto the back-stack."""
-            nonlocal filename, marks, viewer
+            nonlocal filename, marks
             if not url.endswith('.md'):
                 return False
             nav_stack.append((filename, viewer.get_scroll_position()))
             del fwd_stack[:]  # New direction clears forward history
             filename = url
-            viewer = MarkdownViewer(GR_AFF, height=VIEWER_HEIGHT_FULL)
-            viewer.load_markdown_file(filename)
+            viewer.reset_for_file(filename)
             saved_s = file_prefs.get_scroll_pos(filename)
             if saved_s > 0:
                 viewer.set_scroll_position(saved_s)
@@ -343,14 +446,13 @@ def main():
 
         def navigate_back():
             """Pop the back-stack, returning to the previous file."""
-            nonlocal filename, marks, viewer
+            nonlocal filename, marks
             if not nav_stack:
                 return False
             fwd_stack.append((filename, viewer.get_scroll_position()))
             prev_file, prev_scroll = nav_stack.pop()
             filename = prev_file
-            viewer = MarkdownViewer(GR_AFF, height=VIEWER_HEIGHT_FULL)
-            viewer.load_markdown_file(filename)
+            viewer.reset_for_file(filename)
             viewer.set_scroll_position(prev_scroll)
             marks = bookmarks.load(filename)
             viewer.set_bookmarks(marks)
@@ -359,14 +461,13 @@ def main():
 
         def navigate_forward():
             """Pop the forward-stack, going to the next file."""
-            nonlocal filename, marks, viewer
+            nonlocal filename, marks
             if not fwd_stack:
                 return False
             nav_stack.append((filename, viewer.get_scroll_position()))
             next_file, next_scroll = fwd_stack.pop()
             filename = next_file
-            viewer = MarkdownViewer(GR_AFF, height=VIEWER_HEIGHT_FULL)
-            viewer.load_markdown_file(filename)
+            viewer.reset_for_file(filename)
             viewer.set_scroll_position(next_scroll)
             marks = bookmarks.load(filename)
             viewer.set_bookmarks(marks)
@@ -375,32 +476,34 @@ def main():
 
         def _draw_split_toc():
             """Draw the mini-TOC pane in split view mode."""
-            c = theme.colors
-            fillrect(0, 0, 0, 320, 82, c['bg'], c['bg'])
+            (bg, _, _, _, _, border, normal, italic,
+             sel_bg, sel_t, _) = _C
+            _invalidate_progress()
+            fillrect(0, 0, 0, 320, 82, bg, bg)
             from graphics import draw_rectangle as _dr
-            _dr(GR_AFF, 0, 80, 320, 82,
-                c['table_border'], 255, c['table_border'], 255)
+            _dr(GR_AFF, 0, 80, 320, 82, border, 255, border, 255)
             headers = viewer.get_headers()
             if not headers:
-                draw_text(GR_AFF, 10, 5, "No headers",
-                          FONT_10, c.get('italic', c['normal']))
+                draw_text(GR_AFF, 10, 5, "No headers", FONT_10, italic)
                 return
             cur = viewer.get_current_header_idx()
             max_show = 5
             start = max(0, cur - max_show // 2)
-            sel_bg = c.get('browser_sel', 0x000080)
-            sel_t = c.get('browser_sel_text', 0xFFFFFF)
+            labels = get_toc_labels(headers)
             for i in range(start, min(start + max_show, len(headers))):
                 y = 4 + (i - start) * 15
-                level, title, _ = headers[i]
-                prefix = '  ' * (level - 1)
                 if i == cur:
                     fillrect(0, 5, y, 310, 14, sel_bg, sel_bg)
-                    draw_text(GR_AFF, 10, y + 1, prefix + title,
+                    draw_text(GR_AFF, 10, y + 1, labels[i],
                               FONT_10, sel_t, 300)
                 else:
-                    draw_text(GR_AFF, 10, y + 1, prefix + title,
-                              FONT_10, c['normal'], 300)
+                    draw_text(GR_AFF, 10, y + 1, labels[i],
+                              FONT_10, normal, 300)
+
+        def switch_theme():
+            theme.toggle()
+            _refresh_palette()
+            redraw()
 
         def toggle_split():
             nonlocal split_mode
@@ -424,6 +527,7 @@ def main():
                        "Go to %", "Shortcuts", "Doc Info"]
             if fwd_stack:
                 choices.append("Forward \u25B6")
+            from ui import show_context_menu
             choice = show_context_menu(160, 100, choices,
                                        content_bottom=220)
             if choice == 0:  # Font
@@ -435,12 +539,14 @@ def main():
             elif choice == 2:  # Split
                 toggle_split()
             elif choice == 3:  # Go to %
+                from ui import show_goto_dialog
                 pct = show_goto_dialog()
                 if pct is not None:
                     viewer.scroll_to_ratio(pct / 100.0)
                     viewer.render()
                 redraw()
             elif choice == 4:  # Shortcuts
+                from ui import show_shortcuts_overlay
                 show_shortcuts_overlay()
                 redraw()
             elif choice == 5:  # Doc Info
@@ -450,86 +556,95 @@ def main():
             else:
                 redraw()
 
+        # Hot callables and thresholds as plain locals (const() values
+        # from constants are not inlined across modules).  Navigation
+        # reuses the viewer, so its bound methods stay valid.  Scroll
+        # keys repaint the overlay afterwards; action keys handle their
+        # own drawing.
+        poll_input = poll
+        ticks = get_ticks
+        draw_overlay = _draw_overlay
+        menu_y = MENU_Y
+        drag_min = DRAG_THRESHOLD
+        drag2 = DRAG_THRESHOLD * 2
+        drag3_sq = (DRAG_THRESHOLD * 3) ** 2
+        long_press_ms = LONG_PRESS_MS
+        action_keys = {
+            KEY_F1: do_search,
+            KEY_F3: open_toc,
+            KEY_F4: open_toc,
+            KEY_F5: open_more_menu,
+            KEY_F6: switch_theme,
+            KEY_RIGHT: navigate_forward,
+        }
+        scroll_keys = {
+            KEY_UP: viewer.scroll_up,
+            KEY_DOWN: viewer.scroll_down,
+            KEY_PLUS: viewer.scroll_page_down,
+            KEY_MINUS: viewer.scroll_page_up,
+            KEY_BACKSPACE: viewer.scroll_to_top,
+            KEY_LOG: viewer.scroll_to_bottom,
+            KEY_F2: viewer.search_next,
+        }
+        scroll_by_fast = viewer.scroll_by_fast
+        render = viewer.render
         try:
             while True:
-                key = get_key()
+                # mouse() reports only the latest contact point, so drag
+                # samples are already coalesced: each pass renders at most
+                # once, paced by the 1/20 s wait in poll().
+                key, tx, ty = poll_input()
                 if key > 0:
                     if menu_visible:
                         hide_menu()
-                    if key == KEY_ESC:
-                        if not navigate_back():
-                            break
-                        continue
-                    elif key == KEY_UP:
-                        viewer.scroll_up()
-                        _draw_overlay()
-                    elif key == KEY_DOWN:
-                        viewer.scroll_down()
-                        _draw_overlay()
-                    elif key == KEY_PLUS:
-                        viewer.scroll_page_down()
-                        _draw_overlay()
-                    elif key == KEY_MINUS:
-                        viewer.scroll_page_up()
-                        _draw_overlay()
-                    elif key == KEY_BACKSPACE:
-                        viewer.scroll_to_top()
-                        _draw_overlay()
-                    elif key == KEY_LOG:
-                        viewer.scroll_to_bottom()
-                        _draw_overlay()
-                    elif key == KEY_F1:
-                        do_search()
-                    elif key == KEY_F2:
-                        viewer.search_next()
-                        _draw_overlay()
-                    elif key == KEY_F3:
-                        open_toc()
-                    elif key == KEY_F4:
-                        open_toc()
-                    elif key == KEY_F5:
-                        open_more_menu()
-                    elif key == KEY_F6:
-                        theme.toggle()
-                        redraw()
-                    elif key == KEY_LEFT:
+                    if key == KEY_ESC or key == KEY_LEFT:
                         if not navigate_back():
                             break
                         continue
-                    elif key == KEY_RIGHT:
-                        navigate_forward()
+                    handler = scroll_keys.get(key)
+                    if handler:
+                        handler()
+                        draw_overlay()
+                    else:
+                        handler = action_keys.get(key)
+                        if handler:
+                            handler()
+                            # The touch sample predates the dialog
+                            continue
 
-                tx, ty = get_touch()
                 if tx >= 0 and ty >= 0:
                     if not touch_down:
                         touch_down = True
                         tap_x = tx
                         tap_y = ty
                         drag_last_y = ty
-                        touch_start_time = get_ticks()
+                        long_press_at = ticks() + long_press_ms
                         long_press_fired = False
+                        # Long-press stays possible until the finger moves
+                        lp_armed = not menu_visible and ty < menu_y
                         # Check if starting a scrollbar drag
                         if not menu_visible and viewer.is_scrollbar_tap(tx, ty):
                             scrollbar_dragging = True
                             ratio = viewer.scrollbar_y_to_ratio(ty)
                             viewer.scroll_to_ratio(ratio)
-                            viewer.render()
-                            _draw_overlay()
+                            render()
+                            draw_overlay()
                     else:
                         # Continue scrollbar drag
                         if scrollbar_dragging:
                             ratio = viewer.scrollbar_y_to_ratio(ty)
                             viewer.scroll_to_ratio(ratio)
-                            viewer.render()
-                            _draw_overlay()
+                            render()
+                            draw_overlay()
                         else:
-                            moved_lp = abs(tx - tap_x) + abs(ty - tap_y)
-                            if (not long_press_fired and
-                                    not menu_visible and
-                                    moved_lp < DRAG_THRESHOLD * 3 and
-                                    tap_y < MENU_Y):
-                                elapsed = get_ticks() - touch_start_time
-                                if elapsed >= LONG_PRESS_MS:
+                            if lp_armed:
+                                dx = tx - tap_x
+                                dy = ty - tap_y
+                                if dx * dx + dy * dy >= drag3_sq:
+                                    lp_armed = False
+                            if lp_armed:
+                                if ticks() >= long_press_at:
+                                    lp_armed = False
                                     long_press_fired = True
                                     ctx_items = ["Add Bookmark",
                                                  "Copy Line"]
@@ -537,6 +652,7 @@ def main():
                                     cur_tag = file_prefs.get_tag(filename)
                                     tag_label = "Tag: " + file_prefs.TAG_NAMES[cur_tag]
                                     ctx_items.append(tag_label)
+                                    from ui import show_context_menu
                                     choice = show_context_menu(
                                         tap_x, tap_y, ctx_items,
                                         content_bottom=240)
@@ -558,11 +674,11 @@ def main():
                                     touch_down = False
                                     drag_last_y = -1
                             else:
-                                if not menu_visible and ty < MENU_Y and drag_last_y >= 0:
+                                if not menu_visible and ty < menu_y and drag_last_y >= 0:
                                     delta = drag_last_y - ty
-                                    if abs(delta) >= DRAG_THRESHOLD:
-                                        viewer.scroll_by_fast(delta)
-                                        _draw_overlay()
+                                    if abs(delta) >= drag_min:
+                                        scroll_by_fast(delta)
+                                        draw_overlay()
                                         drag_last_y = ty
                 else:
                     if touch_down:
@@ -570,9 +686,9 @@ def main():
                         scrollbar_dragging = False
                         if not long_press_fired:
                             moved = abs(tap_y - drag_last_y) if drag_last_y >= 0 else 0
-                            if moved < DRAG_THRESHOLD * 2:
+                            if moved < drag2:
                                 if menu_visible:
-                                    slot = get_menu_tap(tap_x, tap_y, MENU_Y)
+                                    slot = get_menu_tap(tap_x, tap_y, menu_y)
                                     if slot >= 0:
                                         if slot == 0:
                                             do_search()
@@ -587,16 +703,14 @@ def main():
                                         elif slot == 4:
                                             open_more_menu()
                                         elif slot == 5:
-                                            theme.toggle()
                                             menu_visible = False
-                                            redraw()
+                                            switch_theme()
                                     else:
                                         hide_menu()
                                 elif is_notch_tap(tap_x, tap_y):
                                     show_menu()
-                                elif (tap_y >= 227 and tap_y <= 240
-                                      and tap_x >= _search_pill_x
-                                      and _search_pill_x < 320):
+                                elif (227 <= tap_y <= 240
+                                      and _search_pill_x <= tap_x < 320):
                                     viewer.search_next()
                                     _draw_overlay()
                                 else:
@@ -611,13 +725,13 @@ def main():
                                     # Split view TOC tap
                                     if split_mode and tap_y < 82:
                                         headers = viewer.get_headers()
-                                        if headers:
+                                        row = _TOC_ROWS[tap_y]
+                                        if headers and row != 255:
                                             cur = viewer.get_current_header_idx()
                                             max_show = 5
                                             start = max(0, cur - max_show // 2)
-                                            row = (tap_y - 4) // 15
                                             idx = start + row
-                                            if 0 <= idx < len(headers):
+                                            if idx < len(headers):
                                                 _, _, li = headers[idx]
                                                 viewer.scroll_to_line(li)
                                                 _draw_overlay()
@@ -626,11 +740,12 @@ def main():
         except KeyboardInterrupt:
             action = 'exit'
 
-        last_file = filename
-        last_scroll = viewer.get_scroll_position()
-        save_last_file(filename, last_scroll)
-        file_prefs.set_scroll_pos(filename, last_scroll)
-        file_prefs.set_progress(filename, viewer.get_progress_percent())
+        scroll = viewer.get_scroll_position()
+        if filename != last_file or scroll != last_scroll:
+            save_last_file(filename, scroll)
+            last_file = filename
+            last_scroll = scroll
+        file_prefs.persist(filename, scroll, viewer.get_progress_percent())
 
         if action == 'exit':
             return
@@ -15,11 +15,28 @@ class MarkdownViewer:
         self.gr = gr
         self.height = height
         self.document = MarkdownDocument()
+        self._headers = None  # get_headers() result for the loaded lines
 
     def load_markdown_file(self, filename):
         """Load markdown content from a file."""
+        self._headers = None
         return self.document.load_file(filename)
 
+    def reset_for_file(self, filename):
+        """Load another file into this viewer, reusing its renderer.
+
+        Font, word wrap, viewport, formula cache and the back buffer carry
+        over; scroll, search, bookmarks and line caches start fresh.
+        """
+        doc = self.document
+        if doc.renderer:
+            doc.renderer.reset_document()
+        # Drop the old text before reading the new file so both are
+        # never held at once (load_file collects afterwards).
+        doc.lines = []
+        doc.content = ""
+        return self.load_markdown_file(filename)
+
     def render(self):
         """Render the loaded markdown document."""
         self.document.render(self.gr, height=self.height)
@@ -189,8 +206,11 @@ class MarkdownViewer:
     def get_headers(self):
         """Extract table of contents from the document.
 
-        Returns list of (level, title, line_index) tuples.
+        Returns list of (level, title, line_index) tuples.  The list is
+        built once per loaded file and shared; callers must not modify it.
         """
+        if self._headers is not None:
+            return self._headers
         if not self.document.lines:
             return []
         headers = []
@@ -205,6 +225,7 @@ class MarkdownViewer:
                 title = stripped[level:].strip()
                 if title:
                     headers.append((level, title, i))
+        self._headers = headers
         return headers
 
     def scroll_to_line(self, line_index):
@@ -259,7 +280,7 @@ class MarkdownViewer:
         m = r._max_scroll()
         if m <= 0:
             return 100
-        return min(100, int(r.scroll_offset * 100 / m))
+        return min(100, r.scroll_offset * 100 // m)
 
     def cycle_font(self):
         """Cycle body font through 10px, 12px, 14px."""
@@ -413,6 +434,20 @@ class MarkdownRenderer:
         self._collapsed_headers = set()
         self._render_count = 0
 
+    def reset_document(self):
+        """Forget everything tied to the current document."""
+        self.scroll_offset = 0
+        self._content_height = 0
+        self._search_term = None
+        self._search_positions = []
+        self._search_match_idx = 0
+        self._bookmarks = []
+        del self._link_zones[:]
+        del self._header_zones[:]
+        self._line_y_cache = []
+        self._line_fence_cache = []
+        self._collapsed_headers = set()
+
     def _in_view(self, y, h=12):
         """Check if a line at y with height h is within the visible area."""
         return y >= self.y and y + h <= self.y + self.height
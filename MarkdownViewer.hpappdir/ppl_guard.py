@@ -24,7 +24,28 @@ Reference: https://www.hpmuseum.org/forum/thread-23501.html
 
 from hpprime import eval as heval
 
-_saved_separator = None
+_READ_SEP = 'HSeparator'
+_FORCE_DOT = 'HSeparator:=0'
+# Restore commands for the Digit Grouping options, built once
+_RESTORE_CMDS = tuple('HSeparator:=%d' % i for i in range(9))
+
+
+def _read_separator():
+    """Return the current HSeparator setting, or None if unreadable."""
+    try:
+        sep = heval(_READ_SEP)
+        # PPL usually hands back an int already; convert only if not
+        return sep if type(sep) is int else int(sep)
+    except Exception:
+        return None
+
+
+# Probed once at import; the first init() uses it instead of asking
+# PPL again, then clears it
+_initial_separator = _read_separator()
+
+_active = False
+_restore_cmd = None  # PPL command cleanup() runs, or None if nothing to undo
 
 
 def init():
@@ -32,18 +53,37 @@ def init():
 
     Call this ONCE at app startup, before any PPL eval calls
     that use decimal numbers or multi-argument PPL functions.
+    Further calls before cleanup() do nothing.  After cleanup()
+    it may be called again; HSeparator is then read afresh, as
+    the user may have changed it since the app started.
     """
-    global _saved_separator
-    try:
-        _saved_separator = int(heval('HSeparator'))
-    except:
-        _saved_separator = 0
+    global _initial_separator, _active, _restore_cmd
+    if _active:
+        return  # already active; cleanup() re-arms it
+    # The import probe is only current for the first init(); any
+    # init() after cleanup() must ask PPL again.
+    sep = _initial_separator
+    if sep is None:
+        sep = _read_separator()
+    _initial_separator = None
+    _active = True
+    # Already in dot decimal mode (the usual factory setting) —
+    # nothing to force.  None (unreadable) still forces below.
+    if sep == 0:
+        return
+    # Resolve the restore command now so cleanup() is a single eval.
+    # Only real options (positive ints) are restored.
+    if sep is not None and sep > 0:
+        if sep < len(_RESTORE_CMDS):
+            _restore_cmd = _RESTORE_CMDS[sep]
+        else:
+            _restore_cmd = 'HSeparator:=%d' % sep
     # Force dot decimal separator (option 0 = 123,456.789)
     # HSeparator:=0 uses only integers, so it works safely
     # regardless of the current decimal separator setting.
     try:
-        heval('HSeparator:=0')
-    except:
+        heval(_FORCE_DOT)
+    except Exception:
         pass
 
 
@@ -51,11 +91,16 @@ def cleanup():
     """Restore the original HSeparator setting.
 
     Call this on app exit to leave the calculator in its
-    original state.
+    original state.  Safe to call more than once: only the first
+    call after init() restores anything.
     """
-    global _saved_separator
-    if _saved_separator is not None:
+    global _active, _restore_cmd
+    # None if init() never ran or the setting was already 0
+    # (dot mode is what the calculator had).
+    if _restore_cmd is not None:
         try:
-            heval('HSeparator:=%d' % _saved_separator)
-        except:
+            heval(_restore_cmd)
+        except Exception:
             pass
+    _active = False
+    _restore_cmd = None
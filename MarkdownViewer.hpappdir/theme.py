@@ -133,6 +133,22 @@ def toggle():
         colors.update(LIGHT)
 
 
+def snapshot():
+    """Return the colors used by the viewer chrome as a flat tuple.
+
+    Order: bg, menu_bg, menu_text, header, progress_bar, table_border,
+    normal, italic, browser_sel, browser_sel_text, bookmark_mark.
+    Take a fresh snapshot after init() and every toggle().
+    """
+    c = colors
+    normal = c['normal']
+    return (c['bg'], c['menu_bg'], c['menu_text'], c['header'],
+            c.get('progress_bar', c['header']), c['table_border'],
+            normal, c.get('italic', normal),
+            c.get('browser_sel', 0x000080),
+            c.get('browser_sel_text', 0xFFFFFF), c['bookmark_mark'])
+
+
 def is_dark():
     """Return True if dark theme is active."""
     return _is_dark
@@ -81,13 +81,19 @@ def draw_notch(colors=None):
         fillrect(GR_AFF, NOTCH_X + 12, ly, 14, 1, fg, fg)
 
 
+# Notch hit box, 4 px larger than the visual notch on every side
+_NOTCH_X0 = NOTCH_X - 4
+_NOTCH_X1 = NOTCH_X + NOTCH_W + 4
+_NOTCH_Y0 = NOTCH_Y - 4
+_NOTCH_Y1 = NOTCH_Y + NOTCH_H + 4
+
+
 def is_notch_tap(tx, ty):
     """Return True if (tx, ty) is within the notch hit area.
 
     The hit area is slightly larger than the visual notch for easier tapping.
     """
-    return (tx >= NOTCH_X - 4 and tx < NOTCH_X + NOTCH_W + 4
-            and ty >= NOTCH_Y - 4 and ty < NOTCH_Y + NOTCH_H + 4)
+    return _NOTCH_X0 <= tx < _NOTCH_X1 and _NOTCH_Y0 <= ty < _NOTCH_Y1
 
 
 def save_menu_area(menu_y=220, menu_h=20):